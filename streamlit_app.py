@@ -1,6 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+import datetime
 import json
+import os
+import re
+import time
+import uuid
+import orjson
+import pyarrow as pa
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
 from typing import Optional
 
 st.set_page_config(page_title="Cognitive Behavior Annotator", layout="wide")
@@ -16,21 +26,214 @@ st.markdown(
     " Enter the counts below and save the record. Finally, download the output JSONL file."
 )
 
+# working copy on disk: a Parquet snapshot plus an append-only log of saves made since
+SNAPSHOT_PATH = "annotated_output.parquet"
+UPDATES_PATH = "annotated_output.updates.jsonl"
+# Parquet schema metadata key listing the columns stored as per-cell JSON
+SNAPSHOT_JSON_COLS_KEY = b"json_columns"
+# one JSON document per line; numpy scalars are serialized natively
+JSONL_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+# per-row JSON kept alongside the data so the JSONL download is a plain bytes join
+ENCODED_COL = "_encoded"
+# a non-blank JSONL line (group 1 drops leading blanks); lines end at \n, \r or \r\n like bytes.splitlines
+JSONL_LINE_PATTERN = re.compile(rb"[^\S\r\n]*(\S[^\r\n]*)")
+# bytes handed to the Arrow JSON reader per parse block
+JSON_BLOCK_SIZE = 8 << 20
+# named sessions keep their working copy here so a reopened tab resumes without re-uploading
+SESSIONS_DIR = "sessions"
+SESSIONS_INDEX_PATH = os.path.join(SESSIONS_DIR, "index.json")
+# least recently used sessions are deleted once the store grows past this size
+SESSIONS_MAX_BYTES = 1 << 30
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
 # ---------- helper functions ----------
-def load_jsonl_from_bytes(b: bytes) -> pd.DataFrame:
-    text = b.decode("utf-8")
-    lines = [line for line in text.splitlines() if line.strip()]
-    records = [json.loads(line) for line in lines]
-    return pd.DataFrame(records)
-
-def save_jsonl(df: pd.DataFrame, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        # Convert to dict and ensure integers are written as standard numbers, not numpy types
-        records = df.to_dict(orient="records")
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+def load_jsonl_from_buffer(buf: memoryview) -> pd.DataFrame:
+    # buf is the upload's own memory. Arrow reads it in place block by block straight into
+    # a columnar Table, so no bytes copy, decoded str, line list or list of dicts is held
+    # alongside the upload. Not cached: each upload is parsed once per session anyway, and
+    # a cache would keep a pickled copy of every uploaded DataFrame in server memory.
+    try:
+        table = pa_json.read_json(
+            pa.BufferReader(pa.py_buffer(buf)),
+            read_options=pa_json.ReadOptions(block_size=JSON_BLOCK_SIZE),
+            parse_options=pa_json.ParseOptions(newlines_in_values=False),
+        )
+    except pa.ArrowInvalid:
+        # Arrow needs one type per column; valid JSONL may change a field's type between rows
+        return _load_jsonl_per_line(buf)
+    if not all(_arrow_type_round_trips(field.type) for field in table.schema):
+        return _load_jsonl_per_line(buf)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def _arrow_type_round_trips(arrow_type) -> bool:
+    # Arrow turns ISO date strings into timestamps and merges nested objects into one struct
+    # (adding null keys to records that lacked them), so such columns would not be written
+    # back out as they were read
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_struct(arrow_type):
+        return False
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return _arrow_type_round_trips(arrow_type.value_type)
+    return True
+
+def _load_jsonl_per_line(buf: memoryview) -> pd.DataFrame:
+    # slower path that keeps every value exactly as written, whatever its type per row.
+    # Lines are found with a regex over the upload's own memory and parsed from memoryview
+    # slices, so the upload is not copied again.
+    return pd.DataFrame([orjson.loads(buf[m.start(1):m.end(1)]) for m in JSONL_LINE_PATTERN.finditer(buf)])
+
+def append_update(path: str, snapshot_token: str, idx: int, patch: dict) -> bool:
+    # O(1) per save: only the edited fields are written, the base records are left untouched.
+    # The log starts with the token of the snapshot it belongs to; if another session has
+    # written its own snapshot since, appending our row indexes to it would corrupt it.
+    try:
+        with open(path, "a+b") as f:
+            f.seek(0)
+            header = f.readline()
+            if not header or orjson.loads(header).get("_snapshot") != snapshot_token:
+                return False
+            # a partial last line from an interrupted save would swallow this update; let the
+            # caller write a fresh snapshot instead
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                return False
+            f.write(orjson.dumps({"_op": "update", "_idx": idx, **patch}, option=JSONL_OPTIONS))
+    except FileNotFoundError:
+        return False
+    return True
+
+def _orjson_default(obj):
+    # Arrow-backed columns report missing values as pd.NA, which orjson does not know
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    # orjson only serializes exact date/time instances, not subclasses such as pd.Timestamp;
+    # every record is encoded at load, so any such cell would otherwise fail the whole upload
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, pd.Timedelta):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def encode_record(record: dict) -> bytes:
+    return orjson.dumps(record, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _temp_path(path: str) -> str:
+    # unique per write, so sessions saving to the same file never share a temp file
+    return f"{path}.{uuid.uuid4().hex}.tmp"
+
+def write_snapshot(df: pd.DataFrame, path: str, updates_path: str) -> str:
+    # write to a temp file first so a crash never leaves a half-written snapshot
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = _temp_path(path)
+    pq.write_table(_snapshot_table(df), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    # the snapshot now includes every logged update: start a fresh log tagged with its token
+    snapshot_token = uuid.uuid4().hex
+    tmp_path = _temp_path(updates_path)
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps({"_op": "snapshot", "_snapshot": snapshot_token}, option=JSONL_OPTIONS))
+    os.replace(tmp_path, updates_path)
+    return snapshot_token
+
+def _snapshot_table(df: pd.DataFrame) -> pa.Table:
+    # object columns come from the per-line loader and may mix types per row (or hold nested
+    # objects), which Parquet cannot store as is; keep each of their cells as its JSON bytes
+    df = df.drop(columns=[ENCODED_COL], errors="ignore")
+    json_cols = [col for col in df.columns if df[col].dtype == object]
+    df = df.assign(**{col: [encode_record(v) for v in df[col]] for col in json_cols})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), SNAPSHOT_JSON_COLS_KEY: orjson.dumps(json_cols)}
+    return table.replace_schema_metadata(metadata)
+
+def read_snapshot(path: str) -> pd.DataFrame:
+    table = pq.read_table(path)
+    json_cols = orjson.loads((table.schema.metadata or {}).get(SNAPSHOT_JSON_COLS_KEY, b"[]"))
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    for col in json_cols:
+        df[col] = pd.Series([orjson.loads(v) for v in df[col]], index=df.index, dtype=object)
+    return df
+
+def read_updates(path: str) -> tuple:
+    # (snapshot token, updates) from a log written by write_snapshot/append_update
+    if not os.path.exists(path):
+        return None, []
+    with open(path, "rb") as f:
+        lines = [line for line in f if line.strip()]
+    entries = [orjson.loads(line) for line in lines[:-1]]
+    if lines:
+        try:
+            entries.append(orjson.loads(lines[-1]))
+        except orjson.JSONDecodeError:
+            # a save interrupted mid-write leaves a partial last line; everything before it is intact
+            pass
+    if entries and entries[0].get("_op") == "snapshot":
+        return entries[0]["_snapshot"], entries[1:]
+    return None, entries
+
+def session_paths(session_id: Optional[str]) -> tuple:
+    # (snapshot, updates log) for a named session, or the plain working files without one
+    if not session_id:
+        return SNAPSHOT_PATH, UPDATES_PATH
+    return (
+        os.path.join(SESSIONS_DIR, f"{session_id}.parquet"),
+        os.path.join(SESSIONS_DIR, f"{session_id}.updates.jsonl"),
+    )
+
+def touch_session(session_id: str) -> None:
+    # record the session as most recently used, then evict old sessions over the size cap
+    try:
+        with open(SESSIONS_INDEX_PATH, "rb") as f:
+            index = orjson.loads(f.read())
+    except FileNotFoundError:
+        index = {}
+    index[session_id] = time.time()
+
+    sizes = {
+        sid: sum(os.path.getsize(path) for path in session_paths(sid) if os.path.exists(path))
+        for sid in index
+    }
+    total = sum(sizes.values())
+    for sid in sorted(index, key=index.get):
+        if total <= SESSIONS_MAX_BYTES:
+            break
+        if sid == session_id:
+            continue
+        for path in session_paths(sid):
+            if os.path.exists(path):
+                os.remove(path)
+        total -= sizes[sid]
+        del index[sid]
+
+    tmp_path = _temp_path(SESSIONS_INDEX_PATH)
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(index))
+    os.replace(tmp_path, SESSIONS_INDEX_PATH)
+
+def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.drop(columns=[ENCODED_COL], errors="ignore").to_csv(index=False).encode("utf-8")
+
+def df_to_jsonl_bytes(df: pd.DataFrame) -> bytes:
+    return b"\n".join(df[ENCODED_COL].tolist())
+
+def export_bytes(name: str, build) -> bytes:
+    # kept per session for the current revision only: a save bumps rev and replaces the
+    # entry, so stale exports are never held and other sessions' exports never count here
+    cached = st.session_state.get(f"export_{name}")
+    if cached is None or cached[0] != st.session_state.rev:
+        cached = (st.session_state.rev, build(st.session_state.df))
+        st.session_state[f"export_{name}"] = cached
+    return cached[1]
 
 # ---------- sidebar: load file or example ----------
+session_id = st.sidebar.text_input(
+    "Session id (optional)",
+    help="Saves are kept under this id; entering it again later resumes without re-uploading.",
+).strip()
+if session_id and not SESSION_ID_PATTERN.fullmatch(session_id):
+    st.sidebar.error("Session id may only contain letters, digits, '-' and '_'.")
+    session_id = ""
 uploaded = st.sidebar.file_uploader("Upload JSONL file", type=["jsonl", "txt", "json"])
 use_example = st.sidebar.checkbox("Use example data (demo)")
 
@@ -38,14 +241,106 @@ if "df" not in st.session_state:
     st.session_state.df = None
 if "idx" not in st.session_state:
     st.session_state.idx = 0
+# revision counter bumped on every save, used to key the cached exports
+if "rev" not in st.session_state:
+    st.session_state.rev = 0
+# the first save of a session writes the full records, later saves only append updates
+# to the log of the snapshot identified by this token
+if "snapshot_token" not in st.session_state:
+    st.session_state.snapshot_token = None
 
 # List of columns we need for annotation
 ANNOTATION_COLS = ["sub_goal_setting", "verification", "backtracking", "backward_chaining"]
+# Counts are stored as int32, so inputs and loaded values are kept within its range
+COUNT_MAX = int(np.iinfo(np.int32).max)
+# Columns tried in order for the text shown to the annotator
+PROMPT_COLS = ["input prompt", "input", "prompt", "text"]
+
+def set_working_df(df: pd.DataFrame) -> None:
+    # Ensure annotation cols exist in DataFrame, default to 0 if missing.
+    # They are numpy-backed (not Arrow, whose arrays are immutable) so a save is a plain scalar store.
+    for col in ANNOTATION_COLS:
+        if col in df.columns:
+            # via float64 so unparseable values are NaN that fillna catches; clipped so the int32
+            # cast cannot wrap and every value fits the number inputs' range
+            counts = pd.to_numeric(df[col], errors="coerce").astype("float64").fillna(0).clip(0, COUNT_MAX)
+            df[col] = counts.astype(np.int32)
+        else:
+            df[col] = np.zeros(len(df), dtype=np.int32)
+
+    if "annotator_comment" in df.columns:
+        df["annotator_comment"] = df["annotator_comment"].astype(object).fillna("")
+    else:
+        # an explicit object Series; a bare "" or object ndarray is inferred as str under pandas 3
+        df["annotator_comment"] = pd.Series(np.full(len(df), "", dtype=object), index=df.index, dtype=object)
+
+    # Remove old 'annotation' column if it exists to keep output clean (optional)
+    if "annotation" in df.columns:
+        df.drop(columns=["annotation"], inplace=True)
+
+    # encode every record once here; saves re-encode only the row they change
+    if ENCODED_COL in df.columns:
+        df.drop(columns=[ENCODED_COL], inplace=True)
+    df[ENCODED_COL] = [encode_record(r) for r in df.to_dict(orient="records")]
+
+    st.session_state.df = df
+    # where saves go for this load; fixed so renaming the session later cannot split a snapshot from its log
+    st.session_state.session_id = session_id
+    st.session_state.store_paths = session_paths(session_id)
+    # resolve column positions once per load; they do not change afterwards
+    st.session_state.col_pos = {col: i for i, col in enumerate(df.columns)}
+    prompt_col = next((key for key in PROMPT_COLS if key in df.columns), None)
+    st.session_state.prompt_col_iloc = df.columns.get_loc(prompt_col) if prompt_col is not None else None
+
+def encode_row(idx: int) -> None:
+    df = st.session_state.df
+    col_pos = st.session_state.col_pos
+    record = {col: df.iat[idx, pos] for col, pos in col_pos.items() if col != ENCODED_COL}
+    df.iat[idx, col_pos[ENCODED_COL]] = encode_record(record)
+
+# Resume saved work (only once): read its snapshot and replay the updates logged since.
+# A named session resumes automatically; the default working files only when asked, since
+# every browser session without an id shares them.
+resume_default = False
+if not session_id and st.session_state.df is None and os.path.exists(SNAPSHOT_PATH):
+    resume_default = st.sidebar.checkbox(f"Resume saved work from {SNAPSHOT_PATH}")
+if st.session_state.df is None and (resume_default or (session_id and os.path.exists(session_paths(session_id)[0]))):
+    resume_source = f"session '{session_id}'" if session_id else SNAPSHOT_PATH
+    try:
+        snapshot_path, updates_path = session_paths(session_id)
+        set_working_df(read_snapshot(snapshot_path))
+        # collapse the log to the last value per field first, so a record saved many times
+        # is written and re-encoded once instead of once per save
+        latest = {}
+        snapshot_token, updates = read_updates(updates_path)
+        for update in updates:
+            idx = update.pop("_idx")
+            update.pop("_op")
+            latest.setdefault(idx, {}).update(update)
+        for idx, patch in latest.items():
+            for col, val in patch.items():
+                st.session_state.df.iat[idx, st.session_state.col_pos[col]] = val
+            encode_row(idx)
+        st.session_state.snapshot_token = snapshot_token
+        if session_id:
+            touch_session(session_id)
+        st.success(f"Resumed {resume_source} with {len(st.session_state.df)} records")
+        if uploaded is not None:
+            st.warning(
+                f"Ignored the uploaded file {uploaded.name}: {resume_source} already has saved work. "
+                "Use a different session id (or none) to annotate the uploaded file instead."
+            )
+    except Exception as e:
+        st.session_state.df = None
+        st.error(f"Failed to resume {resume_source}: {e}")
+        # loading anything else now would make its first save overwrite the saved work
+        st.info("The saved work was left untouched. Use a different session id (or none) to load other data.")
+        st.stop()
 
 # Load uploaded file (only once)
 if uploaded is not None and st.session_state.df is None:
     try:
-        st.session_state.df = load_jsonl_from_bytes(uploaded.getvalue())
+        set_working_df(load_jsonl_from_buffer(uploaded.getbuffer()))
         st.success(f"Loaded {len(st.session_state.df)} records from uploaded file: {uploaded.name}")
     except Exception as e:
         st.error(f"Failed to parse uploaded file: {e}")
@@ -61,24 +356,24 @@ elif use_example and st.session_state.df is None:
         "backtracking": 0,
         "backward_chaining": 0
     }
-    st.session_state.df = pd.DataFrame([example])
+    set_working_df(pd.DataFrame([example]))
     st.success("Loaded example data")
 
 if st.session_state.df is None:
     st.info("Upload a JSONL file on the left (or enable 'Use example data') to begin annotation.")
     st.stop()
 
-# Ensure annotation cols exist in DataFrame, default to 0 if missing
-for col in ANNOTATION_COLS:
-    if col not in st.session_state.df.columns:
-        st.session_state.df[col] = 0
-
-if "annotator_comment" not in st.session_state.df.columns:
-    st.session_state.df["annotator_comment"] = ""
-
-# Remove old 'annotation' column if it exists to keep output clean (optional)
-if "annotation" in st.session_state.df.columns:
-    st.session_state.df.drop(columns=["annotation"], inplace=True)
+# A session id typed after loading: switch the store while nothing has been saved yet.
+# Afterwards the snapshot and its log stay together, so the id change is only reported.
+if session_id != st.session_state.session_id:
+    if session_id and os.path.exists(session_paths(session_id)[0]):
+        st.sidebar.warning(f"Session '{session_id}' already has saved work; open it in a new tab to resume it.")
+    elif st.session_state.snapshot_token is None:
+        st.session_state.session_id = session_id
+        st.session_state.store_paths = session_paths(session_id)
+    else:
+        st.sidebar.warning("This tab has already saved; reload the page to save under a different session id.")
+st.sidebar.caption(f"Saving to {st.session_state.store_paths[0]}")
 
 # ---------- navigation ----------
 n = len(st.session_state.df)
@@ -99,20 +394,23 @@ st.session_state.idx = int(idx_widget)
 st.sidebar.markdown("---")
 
 # ---------- main display ----------
-rec = st.session_state.df.iloc[st.session_state.idx]
+def cell(col: str, default=None):
+    # read a single field of the current record without building the whole row as a Series
+    pos = st.session_state.col_pos.get(col)
+    return st.session_state.df.iat[st.session_state.idx, pos] if pos is not None else default
+
 st.subheader(f"Record {st.session_state.idx} / {n-1}")
 
 with st.expander("View full record (raw JSON)", expanded=False):
-    st.json(rec.to_dict())
+    st.json(orjson.loads(cell(ENCODED_COL)))
 
-# find prompt text
+# find prompt text via the column position resolved at load time
 prompt_text = None
-for key in ["input prompt", "input", "prompt", "text"]:
-    if key in st.session_state.df.columns:
-        prompt_text = rec.get(key)
-        break
-if prompt_text is None:
-    prompt_text = json.dumps(rec.to_dict(), ensure_ascii=False, indent=2)
+if st.session_state.prompt_col_iloc is not None:
+    prompt_text = st.session_state.df.iat[st.session_state.idx, st.session_state.prompt_col_iloc]
+# missing is None, pd.NA or NaN depending on the loader; lists and dicts are real prompts
+if pd.api.types.is_scalar(prompt_text) and pd.isna(prompt_text):
+    prompt_text = json.dumps(orjson.loads(cell(ENCODED_COL)), ensure_ascii=False, indent=2)
 
 st.markdown("**Prompt / Input**")
 st.info(prompt_text)
@@ -121,7 +419,9 @@ st.info(prompt_text)
 st.markdown("---")
 st.markdown("### Annotator Label: Share the number of each cognitive behavior")
 
-col_form, col_save = st.columns([3, 1])
+# widgets live in a form so editing them does not rerun the script; only submitting does
+annotation_form = st.form(f"annot_{st.session_state.idx}", clear_on_submit=False)
+col_form, col_save = annotation_form.columns([3, 1])
 
 with col_form:
     # We use a 2x2 grid for the inputs to make it look cleaner
@@ -130,13 +430,14 @@ with col_form:
 
     # Helper to safely get int value
     def get_val(key):
-        val = rec.get(key, 0)
+        val = cell(key, 0)
         return int(val) if pd.notnull(val) and val != "" else 0
 
     with r1_c1:
         sub_goal_val = st.number_input(
             "Sub goal setting", 
             min_value=0, 
+            max_value=COUNT_MAX,
             step=1, 
             value=get_val("sub_goal_setting"),
             key=f"sub_{st.session_state.idx}"
@@ -145,6 +446,7 @@ with col_form:
         verification_val = st.number_input(
             "Verification", 
             min_value=0, 
+            max_value=COUNT_MAX,
             step=1, 
             value=get_val("verification"),
             key=f"ver_{st.session_state.idx}"
@@ -153,6 +455,7 @@ with col_form:
         backtracking_val = st.number_input(
             "Backtracking", 
             min_value=0, 
+            max_value=COUNT_MAX,
             step=1, 
             value=get_val("backtracking"),
             key=f"back_{st.session_state.idx}"
@@ -161,6 +464,7 @@ with col_form:
         backward_chaining_val = st.number_input(
             "Backward chaining", 
             min_value=0, 
+            max_value=COUNT_MAX,
             step=1, 
             value=get_val("backward_chaining"),
             key=f"chain_{st.session_state.idx}"
@@ -168,27 +472,37 @@ with col_form:
 
     comment = st.text_area(
         "Annotator comment (optional)",
-        value=rec.get("annotator_comment", ""),
+        value=cell("annotator_comment", ""),
         height=80,
         key=f"comment_{st.session_state.idx}"
     )
 
 with col_save:
     st.write("##") # Spacer
-    if st.button("Save / Update this record", type="primary"):
-        # update DataFrame in session state
-        st.session_state.df.at[st.session_state.idx, "sub_goal_setting"] = int(sub_goal_val)
-        st.session_state.df.at[st.session_state.idx, "verification"] = int(verification_val)
-        st.session_state.df.at[st.session_state.idx, "backtracking"] = int(backtracking_val)
-        st.session_state.df.at[st.session_state.idx, "backward_chaining"] = int(backward_chaining_val)
-        st.session_state.df.at[st.session_state.idx, "annotator_comment"] = comment
+    if st.form_submit_button("Save / Update this record", type="primary"):
+        patch = {
+            "sub_goal_setting": sub_goal_val,
+            "verification": verification_val,
+            "backtracking": backtracking_val,
+            "backward_chaining": backward_chaining_val,
+            "annotator_comment": comment,
+        }
+        # update DataFrame in session state; iat with cached positions skips label lookup
+        for col, val in patch.items():
+            st.session_state.df.iat[st.session_state.idx, st.session_state.col_pos[col]] = val
+        encode_row(st.session_state.idx)
         
         # persist to disk
-        save_jsonl(st.session_state.df, "annotated_output.jsonl")
-        st.session_state.df.to_csv("annotated_output.csv", index=False)
-        
-        # reassign copy so Streamlit notices the mutation
-        st.session_state.df = st.session_state.df.copy()
+        st.session_state.rev += 1
+        snapshot_path, updates_path = st.session_state.store_paths
+        appended = st.session_state.snapshot_token is not None and append_update(
+            updates_path, st.session_state.snapshot_token, st.session_state.idx, patch
+        )
+        if not appended:
+            # first save, or another session replaced the snapshot: write this session's records in full
+            st.session_state.snapshot_token = write_snapshot(st.session_state.df, snapshot_path, updates_path)
+            if st.session_state.session_id:
+                touch_session(st.session_state.session_id)
         
         st.success("✅ Saved!")
 
@@ -196,18 +510,30 @@ with col_save:
 st.markdown("---")
 col_a, col_b = st.columns(2)
 with col_a:
-    csv = st.session_state.df.to_csv(index=False).encode("utf-8")
+    csv = export_bytes("csv", df_to_csv_bytes)
     st.download_button("Download CSV of annotations", data=csv, file_name="annotated_output.csv", mime="text/csv")
 with col_b:
-    # Ensure integers are serialized correctly in JSONL
-    jsonl_bytes = "\n".join([json.dumps(r, ensure_ascii=False) for r in st.session_state.df.to_dict(orient="records")]).encode("utf-8")
+    jsonl_bytes = export_bytes("jsonl", df_to_jsonl_bytes)
     st.download_button("Download JSONL of annotations", data=jsonl_bytes, file_name="annotated_output.jsonl", mime="application/json")
 
 st.markdown("### Annotation progress")
-show_df = st.session_state.df.copy()
-if show_df.shape[0] > 200:
-    st.write("(Showing first 200 rows)")
-    show_df = show_df.head(200)
-st.dataframe(show_df)
+# only serialize the preview when asked for; st.dataframe does not mutate the slice, so no copy
+if st.checkbox("Show annotation progress table", value=False):
+    if n > 200:
+        st.write("(Showing first 200 rows)")
+    st.dataframe(st.session_state.df.head(200).drop(columns=[ENCODED_COL]))
 
-st.caption("Files saved to the app working directory: annotated_output.jsonl and annotated_output.csv")
+if st.button("Compact saved output"):
+    # fold the appended updates into a fresh snapshot
+    snapshot_path, updates_path = st.session_state.store_paths
+    st.session_state.snapshot_token = write_snapshot(st.session_state.df, snapshot_path, updates_path)
+    if st.session_state.session_id:
+        touch_session(st.session_state.session_id)
+    st.success(f"Compacted {snapshot_path}")
+
+st.caption(
+    "Saves go to the app working directory as annotated_output.parquet plus appended updates in "
+    "annotated_output.updates.jsonl, or under sessions/ when a session id is set. "
+    "Reopen the app with the same session id, or tick 'Resume saved work' in the sidebar, to continue from them. "
+    "Use 'Compact saved output' to fold the updates into the Parquet file."
+)